@@ -1,15 +1,79 @@
 #!/usr/bin/env python3
 import json
+import mmap
 import os
+import pickle
+import shutil
 import subprocess
+import sys
+import threading
 import time
 import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Tuple, Optional, List
 
+import matplotlib
+matplotlib.use("Agg")  # Неинтерактивный бэкенд: без попыток импорта Tk/Qt
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
+# orjson (C-реализация) парсит большие JSON-отчеты fio в разы быстрее
+# стандартного json; при его отсутствии используется стандартный парсер
+# DPI, с которым сохраняются графики
+PLOT_DPI = 150
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _HAVE_ORJSON = True
+except ImportError:
+    _json_loads = json.loads
+    _HAVE_ORJSON = False
+
+
+@dataclass(slots=True)
+class PatternResult:
+    """Результаты одного паттерна теста в фиксированной форме.
+
+    Отсутствующие метрики (например, задержки или показатели записи
+    для паттерна только на чтение) остаются None; потребителям не нужны
+    проверки наличия ключей в словаре.
+    """
+    pattern: str
+    read_iops: float = 0.0
+    read_bw: float = 0.0
+    read_lat_avg: Optional[float] = None
+    read_lat_max: Optional[float] = None
+    write_iops: Optional[float] = None
+    write_bw: Optional[float] = None
+    write_lat_avg: Optional[float] = None
+    write_lat_max: Optional[float] = None
+
+
+def _envelope(x: np.ndarray, y: np.ndarray,
+              n_bins: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Свертка длинного ряда до min/max-огибающей по корзинам.
+
+    Матплотлиб не может отрисовать больше точек, чем колонок пикселей,
+    поэтому ряд длиннее n_bins сворачивается без потери видимых деталей.
+
+    Args:
+        x (np.ndarray): Значения по оси X (монотонные).
+        y (np.ndarray): Значения по оси Y.
+        n_bins (int): Количество корзин (ширина графика в пикселях).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: X по корзинам,
+            минимумы и максимумы Y в каждой корзине.
+    """
+    edges = np.unique(np.linspace(0, len(x), n_bins,
+                                  endpoint=False).astype(np.intp))
+    return x[edges], np.minimum.reduceat(y, edges), np.maximum.reduceat(y, edges)
+
 
 class RWTest:
     def __init__(self, config_file: Optional[str] = None, cli_args: Optional[Dict] = None):
@@ -32,6 +96,8 @@ class RWTest:
         self.optional_defaults = {
             "runtime": 300,
             "numjobs": 1,
+            "parallel": False,  # Параллельный запуск паттернов
+            "batch": False,  # Все паттерны одним вызовом fio
             "filename": "/tmp/testfile",
             "file_size": "1G",
             "base_results_dir": "./results",
@@ -52,8 +118,8 @@ class RWTest:
         # Загружаем конфиг из файла, если он указан и существует
         file_config = {}
         if config_file and os.path.exists(config_file):
-            with open(config_file) as f:
-                file_config = json.load(f)
+            with open(config_file, "rb") as f:
+                file_config = _json_loads(f.read())
 
         # Объединяем конфиги с учетом приоритетов: cli_args > file_config > default_config
         self.config = {**self.required_defaults, **self.optional_defaults, **file_config}
@@ -70,227 +136,498 @@ class RWTest:
             self.config["base_results_dir"], f"run_{timestamp}")
         os.makedirs(self.results_dir, exist_ok=True)
 
+        # Одна фигура на все паттерны: очищается между графиками
+        # вместо создания нового Figure/Axes на каждый вызов plot_iops
+        self._fig, self._ax = plt.subplots(figsize=(14, 7))
+
     def setup_environment(self):
-        """Подготовка тестового окружения: удаление старого тестового файла и проверка наличия fio."""
-        if os.path.exists(self.config["filename"]):
-            os.remove(self.config["filename"])
+        """Подготовка тестового окружения: удаление старых тестовых файлов и проверка наличия fio."""
+        old_files = [self.config["filename"]]
 
-        try:
-            subprocess.run(["fio", "--version"], check=True,
-                           stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        # В параллельном режиме каждый паттерн пишет в свой файл
+        # {filename}.{name} — их тоже нужно удалить
+        if self.config["parallel"]:
+            old_files += [f"{self.config['filename']}.{pattern[0]}"
+                          for pattern in self.config["patterns"]]
+
+        for old_file in old_files:
+            try:
+                os.remove(old_file)
+            except FileNotFoundError:
+                pass
+
+        # Поиск fio в PATH вместо запуска `fio --version` отдельным процессом
+        if shutil.which("fio") is None:
             print("Установка fio...")
             subprocess.run(["sudo", "apt", "update"], check=True)
             subprocess.run(["sudo", "apt", "install", "-y", "fio"], check=True)
 
-    def run_fio_test(self, pattern: Tuple[str, Dict]) -> str:
-        """Запуск теста fio с заданным паттерном.
-
-        Args:
-            pattern (Tuple[str, Dict]): Кортеж с именем паттерна и параметрами теста.
+    def _common_flags(self) -> List[str]:
+        """Общие флаги fio, одинаковые для всех паттернов.
 
         Returns:
-            str: Путь к файлу с результатами.
+            List[str]: Список аргументов командной строки fio.
         """
-        name, params = pattern
-        output_file = f"{self.results_dir}/result_{name}.json"
-        base_name = output_file.replace('.json', '')
-
-        cmd = [
-            "fio",
-            "--name=test",
+        return [
             f"--ioengine={self.config['ioengine']}",
             f"--direct={self.config['direct']}",
             f"--buffered={self.config['buffered']}",
             f"--bs={self.config['blocksize']}",
             f"--iodepth={self.config['iodepth']}",
-            f"--filename={self.config['filename']}",
             f"--size={self.config['file_size']}",
-            f"--rw={params['rw']}",
-            f"--rwmixread={params['rwmixread']}",
             f"--runtime={self.config['runtime']}",
             f"--numjobs={self.config['numjobs']}",
             "--time_based",
             "--group_reporting",
             "--norandommap",
-            "--output-format=json",
-            f"--output={output_file}",
-            f"--write_iops_log={base_name}",
-            f"--write_lat_log={base_name}",
+            # Перцентили задержек не читаются из отчета — их отключение
+            # сокращает result_*.json в несколько раз
+            "--clat_percentiles=0",
             "--log_avg_msec=1000"
         ]
 
+    def _execute_fio(self, cmd: List[str], name: str, total_runtime: int):
+        """Запуск процесса fio с индикацией прогресса и сбором stderr.
+
+        Args:
+            cmd (List[str]): Команда fio с аргументами.
+            name (str): Имя теста для сообщений.
+            total_runtime (int): Ожидаемая длительность в секундах.
+        """
         print(f"\nЗапуск теста {name}:")
         start_time = time.time()
 
+        # fio пишет результаты в output_file, поэтому stdout не нужен.
+        # stderr вычитывается фоновым потоком, чтобы fio не блокировался
+        # на переполненном буфере пайпа при долгих тестах.
+        stderr_tail = deque(maxlen=200)
+
         try:
-            with subprocess.Popen(cmd, stdout=subprocess.PIPE,
+            with subprocess.Popen(cmd, stdout=subprocess.DEVNULL,
                                   stderr=subprocess.PIPE, text=True) as proc:
-                while proc.poll() is None:
-                    elapsed = int(time.time() - start_time)
-                    total = self.config["runtime"]
-                    print(f"\rПрогресс: {elapsed}/{total} сек", end="", flush=True)
-                    time.sleep(1)
-
+                drain = threading.Thread(
+                    target=lambda: stderr_tail.extend(proc.stderr),
+                    daemon=True)
+                drain.start()
+
+                # Локальные ссылки, чтобы не делать поиск по словарям/атрибутам
+                # на каждой итерации многоминутного цикла
+                _time = time.time
+                _write = sys.stdout.write
+                _flush = sys.stdout.flush
+
+                while True:
+                    try:
+                        # Блокирующее ожидание вместо опроса poll() раз в секунду:
+                        # процесс спит в ядре и возвращается сразу после завершения
+                        proc.wait(timeout=1)
+                        break
+                    except subprocess.TimeoutExpired:
+                        elapsed = int(_time() - start_time)
+                        _write(f"\rПрогресс: {elapsed}/{total_runtime} сек")
+                        _flush()
+
+                drain.join()
                 if proc.returncode != 0:
                     raise subprocess.CalledProcessError(
-                        proc.returncode, cmd, proc.stdout.read(), proc.stderr.read())
+                        proc.returncode, cmd, None, "".join(stderr_tail))
 
         except KeyboardInterrupt:
             proc.terminate()
             raise
 
         print(f"\nТест {name} завершен за {time.time() - start_time:.1f}с")
+
+    def run_fio_test(self, pattern: Tuple[str, Dict],
+                     filename: Optional[str] = None) -> str:
+        """Запуск теста fio с заданным паттерном.
+
+        Args:
+            pattern (Tuple[str, Dict]): Кортеж с именем паттерна и параметрами теста.
+            filename (str, optional): Путь к тестовому файлу
+                (по умолчанию берется из конфигурации).
+
+        Returns:
+            str: Путь к файлу с результатами.
+        """
+        name, params = pattern
+        if filename is None:
+            filename = self.config["filename"]
+        base_name = os.path.join(self.results_dir, f"result_{name}")
+        output_file = base_name + ".json"
+
+        cmd = [
+            "fio",
+            "--name=test",
+            *self._common_flags(),
+            f"--filename={filename}",
+            f"--rw={params['rw']}",
+            f"--rwmixread={params['rwmixread']}",
+            "--output-format=json",
+            f"--output={output_file}",
+            f"--write_iops_log={base_name}",
+            f"--write_lat_log={base_name}"
+        ]
+
+        self._execute_fio(cmd, name, self.config["runtime"])
+        return output_file
+
+    def run_fio_tests_batched(self, patterns: List) -> str:
+        """Запуск всех паттернов одним вызовом fio через стекинг джобов.
+
+        Старт процесса fio и раскладка тестового файла выполняются один
+        раз на все паттерны; джобы разделяются опцией --stonewall и
+        выполняются последовательно внутри одного процесса.
+
+        Args:
+            patterns (List): Список паттернов [имя, параметры].
+
+        Returns:
+            str: Путь к общему JSON-файлу с результатами всех джобов.
+        """
+        output_file = f"{self.results_dir}/result_batch.json"
+
+        # Общие флаги до первого --name становятся умолчаниями всех джобов
+        cmd = [
+            "fio",
+            *self._common_flags(),
+            f"--filename={self.config['filename']}",
+            "--output-format=json",
+            f"--output={output_file}"
+        ]
+
+        for name, params in patterns:
+            base_name = f"{self.results_dir}/result_{name}"
+            cmd += [
+                f"--name={name}",
+                "--stonewall",
+                f"--rw={params['rw']}",
+                f"--rwmixread={params['rwmixread']}",
+                f"--write_iops_log={base_name}",
+                f"--write_lat_log={base_name}"
+            ]
+
+        total = self.config["runtime"] * len(patterns)
+        self._execute_fio(cmd, "batch", total)
         return output_file
 
-    def parse_results(self, json_file: str, pattern_name: str) -> Dict:
+    def parse_results(self, json_file: str, pattern_name: str,
+                      job_name: Optional[str] = None) -> PatternResult:
         """Анализ результатов теста из JSON-файла.
 
         Args:
             json_file (str): Путь к JSON-файлу с результатами теста.
             pattern_name (str): Имя паттерна теста.
+            job_name (str, optional): Имя джоба в общем JSON
+                (для результатов пакетного запуска).
 
         Returns:
-            Dict: Словарь с извлеченными результатами теста.
+            PatternResult: Извлеченные результаты теста.
         """
-        with open(json_file) as f:
-            data = json.load(f)
-
-        job = data["jobs"][0]
-        results = {
-            "pattern": pattern_name,
-            "read_iops": job["read"]["iops"],
-            "read_bw": job["read"]["bw"],
-            "read_lat_avg": None,
-            "read_lat_max": None
-        }
+        # Кэш разобранных результатов: при повторном анализе (перестроение
+        # графиков, подбор порога) не перечитываем большой JSON заново
+        pkl_file = os.path.splitext(json_file)[0]
+        if job_name is not None:
+            pkl_file += f".{job_name}"
+        pkl_file += ".pkl"
+        if (os.path.exists(pkl_file)
+                and os.path.getmtime(pkl_file) >= os.path.getmtime(json_file)):
+            with open(pkl_file, "rb") as f:
+                return pickle.load(f)
+
+        # mmap отдает файл парсеру без прохода через буферы Python I/O;
+        # orjson читает memoryview без копирования, стандартному json
+        # нужна копия bytes
+        with open(json_file, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = _json_loads(memoryview(mm) if _HAVE_ORJSON else mm[:])
+
+        jobs = data["jobs"]
+        if job_name is not None:
+            job = next((j for j in jobs if j.get("jobname") == job_name), None)
+            if job is None:
+                raise ValueError(
+                    f"Джоб {job_name} не найден в {json_file}")
+            results = self._extract_job(pattern_name, job)
+        elif len(jobs) > 1:
+            # Несколько записей (numjobs > 1 без объединенного отчета):
+            # раньше молча бралась только первая, теперь агрегируем все
+            results = self._aggregate_jobs(pattern_name, jobs)
+        else:
+            results = self._extract_job(pattern_name, jobs[0])
+
+        with open(pkl_file, "wb") as f:
+            pickle.dump(results, f, protocol=5)
 
-        # Обработка задержек чтения (конвертация ns → ms)
-        if "lat" in job["read"]:
-            lat = job["read"]["lat"]
-            if "mean" in lat:
-                results["read_lat_avg"] = lat["mean"] / 1_000_000  # ns → ms
-            if "max" in lat:
-                results["read_lat_max"] = lat["max"] / 1_000_000  # ns → ms
+        return results
+
+    def _extract_job(self, pattern_name: str, job: Dict) -> PatternResult:
+        """Извлечение метрик одного джоба fio.
+
+        Args:
+            pattern_name (str): Имя паттерна теста.
+            job (Dict): Запись джоба из JSON-отчета fio.
+
+        Returns:
+            PatternResult: Извлеченные результаты теста.
+        """
+        # Задержки конвертируются из ns в ms; отсутствующие поля
+        # остаются None по умолчаниям датакласса
+        read = job["read"]
+        read_lat = read.get("lat", {})
+        results = PatternResult(
+            pattern=pattern_name,
+            read_iops=read["iops"],
+            read_bw=read["bw"],
+            read_lat_avg=read_lat["mean"] / 1_000_000 if "mean" in read_lat else None,
+            read_lat_max=read_lat["max"] / 1_000_000 if "max" in read_lat else None
+        )
 
         # Обработка операций записи
-        if "write" in job:
-            results.update({
-                "write_iops": job["write"]["iops"],
-                "write_bw": job["write"]["bw"],
-                "write_lat_avg": None,
-                "write_lat_max": None
-            })
-
-            # Обработка задержек записи (конвертация ns → ms)
-            if "lat" in job["write"]:
-                lat = job["write"]["lat"]
-                if "mean" in lat:
-                    results["write_lat_avg"] = lat["mean"] / 1_000_000
-                if "max" in lat:
-                    results["write_lat_max"] = lat["max"] / 1_000_000
+        write = job.get("write")
+        if write is not None:
+            results.write_iops = write["iops"]
+            results.write_bw = write["bw"]
+            write_lat = write.get("lat", {})
+            if "mean" in write_lat:
+                results.write_lat_avg = write_lat["mean"] / 1_000_000
+            if "max" in write_lat:
+                results.write_lat_max = write_lat["max"] / 1_000_000
 
         return results
 
-    def plot_iops(self, pattern_name: str):
+    def _aggregate_jobs(self, pattern_name: str,
+                        jobs: List[Dict]) -> PatternResult:
+        """Агрегация метрик по всем джобам из отчета fio.
+
+        IOPS и пропускная способность суммируются, средняя задержка
+        взвешивается по IOPS джоба, максимальная — максимум по джобам.
+
+        Args:
+            pattern_name (str): Имя паттерна теста.
+            jobs (List[Dict]): Записи джобов из JSON-отчета fio.
+
+        Returns:
+            PatternResult: Агрегированные результаты теста.
+        """
+        parts = [self._extract_job(pattern_name, job) for job in jobs]
+        results = PatternResult(pattern=pattern_name)
+
+        for prefix in ("read", "write"):
+            sums = [(getattr(p, f"{prefix}_iops"), getattr(p, f"{prefix}_bw"))
+                    for p in parts if getattr(p, f"{prefix}_iops") is not None]
+            if not sums:
+                continue
+            setattr(results, f"{prefix}_iops", sum(i for i, _ in sums))
+            setattr(results, f"{prefix}_bw", sum(b for _, b in sums))
+
+            weighted = [(getattr(p, f"{prefix}_lat_avg"),
+                         getattr(p, f"{prefix}_iops"))
+                        for p in parts
+                        if getattr(p, f"{prefix}_lat_avg") is not None]
+            total_weight = sum(w for _, w in weighted)
+            if total_weight:
+                setattr(results, f"{prefix}_lat_avg",
+                        sum(v * w for v, w in weighted) / total_weight)
+
+            maxes = [getattr(p, f"{prefix}_lat_max") for p in parts
+                     if getattr(p, f"{prefix}_lat_max") is not None]
+            if maxes:
+                setattr(results, f"{prefix}_lat_max", max(maxes))
+
+        return results
+
+    def _plot_series(self, times_s: np.ndarray, values: np.ndarray,
+                     label: str, color: str):
+        """Отрисовка одного ряда IOPS с учетом его длины.
+
+        Короткие ряды рисуются обычной растеризованной линией; ряды
+        длиннее ширины графика в пикселях сворачиваются в min/max-огибающую,
+        чтобы не штриховать тысячи неразличимых вершин.
+
+        Args:
+            times_s (np.ndarray): Время в секундах.
+            values (np.ndarray): Значения IOPS.
+            label (str): Подпись ряда для легенды.
+            color (str): Цвет линии.
+        """
+        width_px = int(self._fig.get_figwidth() * PLOT_DPI)
+        if len(values) > width_px:
+            x_ds, y_min, y_max = _envelope(times_s, values, width_px)
+            self._ax.fill_between(x_ds, y_min, y_max, step='mid',
+                                  color=color, label=label, rasterized=True)
+        else:
+            line, = self._ax.plot(times_s, values, label=label, color=color)
+            line.set_rasterized(True)
+
+    def plot_iops(self, pattern_name: str, job_index: int = 1):
         """Построение графика IOPS с отметками о высокой задержке.
 
         Args:
             pattern_name (str): Имя паттерна теста для построения графика.
+            job_index (int): Глобальный индекс джоба в вызове fio —
+                суффикс N в именах логов `*_iops.N.log` (при пакетном
+                запуске у каждого паттерна он свой).
         """
         base_file = f"{self.results_dir}/result_{pattern_name}"
         threshold = self.config["latency_threshold"]
 
         try:
-            # Загрузка данных IOPS
-            iops_data = pd.read_csv(f"{base_file}_iops.1.log",
-                                    header=None,
-                                    names=['time_ms', 'iops', 'r', 'w', 'lat'])
+            # Загрузка данных IOPS в обычный ndarray: нужные колонки
+            # (время, iops, направление) без накладных расходов DataFrame
+            iops_data = np.loadtxt(f"{base_file}_iops.{job_index}.log",
+                                   delimiter=',', dtype=np.int64,
+                                   usecols=(0, 1, 2), ndmin=2)
 
-            plt.figure(figsize=(14, 7))
+            ax = self._ax
+            ax.clear()
 
-            # Разделение данных IOPS
-            read_iops = iops_data[iops_data['r'] == 0]
-            write_iops = iops_data[iops_data['r'] == 1]
+            # Разделение данных IOPS по направлению (0 — чтение, 1 — запись)
+            read_iops = iops_data[iops_data[:, 2] == 0]
+            write_iops = iops_data[iops_data[:, 2] == 1]
 
             # Построение графиков IOPS
-            plt.plot(read_iops['time_ms'] / 1_000, read_iops['iops'],
-                     label='Read IOPS', color='blue')
+            if read_iops.size:
+                self._plot_series(read_iops[:, 0] / 1_000, read_iops[:, 1],
+                                  label='Read IOPS', color='blue')
 
-            if not write_iops.empty:
-                plt.plot(write_iops['time_ms'] / 1_000, write_iops['iops'],
-                         label='Write IOPS', color='red')
+            if write_iops.size:
+                self._plot_series(write_iops[:, 0] / 1_000, write_iops[:, 1],
+                                  label='Write IOPS', color='red')
 
             # Обработка данных о задержке (µs → ms)
             try:
-                lat_data = pd.read_csv(f"{base_file}_lat.1.log",
+                lat_data = pd.read_csv(f"{base_file}_lat.{job_index}.log",
                                        header=None,
-                                       names=['time_ms', 'lat', 'r', 'w', 'l'])
+                                       names=['time_ms', 'lat', 'r', 'w', 'l'],
+                                       usecols=['time_ms', 'lat'],
+                                       dtype={'time_ms': 'int64',
+                                              'lat': 'int64'})
 
                 # Конвертация µs → ms
                 lat_data['lat_ms'] = lat_data['lat'] / 1_000_000
                 high_lat = lat_data[lat_data['lat_ms'] > threshold]
 
                 if not high_lat.empty:
-                    for _, row in high_lat.iterrows():
-                        plt.axvline(x=row['time_ms'] / 1_000, color='orange',
-                                    linestyle='--', alpha=0.3, linewidth=1)
-
-                    plt.axvline(x=0, color='orange', linestyle='--',
-                                label=f'Latency > {threshold}ms', alpha=0.3)
+                    # Все отметки одним векторизованным вызовом вместо
+                    # отдельного axvline на каждую точку
+                    spike_times = high_lat['time_ms'].to_numpy() / 1_000
+                    ax.vlines(spike_times, *ax.get_ylim(), color='orange',
+                              linestyle='--', alpha=0.3, linewidth=1,
+                              label=f'Latency > {threshold}ms')
             except FileNotFoundError:
                 print(f"  Предупреждение: Файл с данными о задержке не найден")
             except Exception as e:
                 print(f"  Ошибка обработки данных о задержке: {str(e)}")
 
-            plt.title(f'IOPS over Time: {pattern_name}\n(Latency threshold: {threshold}ms)')
-            plt.xlabel('Time (s)')
-            plt.ylabel('IOPS')
-            plt.grid(True)
-            plt.legend()
+            ax.set_title(f'IOPS over Time: {pattern_name}\n(Latency threshold: {threshold}ms)')
+            ax.set_xlabel('Time (s)')
+            ax.set_ylabel('IOPS')
+            ax.grid(True)
+            ax.legend()
 
             plot_file = f"{self.results_dir}/iops_{pattern_name}.png"
-            plt.savefig(plot_file, dpi=150, bbox_inches='tight')
-            plt.close()
+            self._fig.savefig(plot_file, dpi=PLOT_DPI, bbox_inches='tight')
             print(f"  График сохранен в {plot_file}")
 
         except Exception as e:
             print(f"  Ошибка при построении графика: {str(e)}")
 
+    def _run_batched(self):
+        """Запуск всех паттернов одним процессом fio и разбор общего JSON."""
+        patterns = self.config["patterns"]
+        try:
+            result_file = self.run_fio_tests_batched(patterns)
+        except Exception as e:
+            print(f"Ошибка пакетного запуска: {str(e)}")
+            return
+
+        # Логи fio нумеруются по глобальному индексу джоба в вызове:
+        # у паттерна N файлы называются result_<name>_iops.N.log
+        for job_index, pattern in enumerate(patterns, start=1):
+            name = pattern[0]
+            try:
+                self._process_results(result_file, name, job_name=name,
+                                      job_index=job_index)
+            except Exception as e:
+                print(f"Ошибка в тесте {name}: {str(e)}")
+
+    def _run_parallel(self):
+        """Параллельный запуск всех паттернов в отдельных потоках.
+
+        Каждый паттерн пишет в собственный файл `{filename}.{name}`,
+        чтобы тесты не затирали данные друг друга.
+        """
+        patterns = self.config["patterns"]
+        with ThreadPoolExecutor(max_workers=len(patterns)) as executor:
+            futures = {}
+            for pattern in patterns:
+                name = pattern[0]
+                print(f"\n=== Запуск теста {name} ===")
+                filename = f"{self.config['filename']}.{name}"
+                future = executor.submit(self.run_fio_test, pattern,
+                                         filename=filename)
+                futures[future] = name
+
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    result_file = future.result()
+                    self._process_results(result_file, name)
+                except Exception as e:
+                    print(f"Ошибка в тесте {name}: {str(e)}")
+
+    def _process_results(self, result_file: str, name: str,
+                         job_name: Optional[str] = None, job_index: int = 1):
+        """Анализ результатов теста, построение графика и вывод сводки.
+
+        Args:
+            result_file (str): Путь к JSON-файлу с результатами теста.
+            name (str): Имя паттерна теста.
+            job_name (str, optional): Имя джоба в общем JSON
+                (для результатов пакетного запуска).
+            job_index (int): Глобальный индекс джоба в вызове fio
+                для поиска файлов логов.
+        """
+        results = self.parse_results(result_file, name, job_name=job_name)
+        self.plot_iops(name, job_index=job_index)
+
+        # Вывод результатов
+        print("\nРезультаты:")
+        print(f"  Read IOPS: {results.read_iops:.0f}")
+        if results.read_lat_avg is not None:
+            print(f"  Read Avg Latency: {results.read_lat_avg:.2f} ms")
+            print(f"  Read Max Latency: {results.read_lat_max:.2f} ms")
+
+        if results.write_iops is not None:
+            print(f"\n  Write IOPS: {results.write_iops:.0f}")
+            if results.write_lat_avg is not None:
+                print(f"  Write Avg Latency: {results.write_lat_avg:.2f} ms")
+                print(f"  Write Max Latency: {results.write_lat_max:.2f} ms")
+
     def run(self):
         """Основной метод для запуска всех тестов и обработки результатов."""
         print("=== Тестирование производительности диска ===")
+        cfg_view = {k: v for k, v in self.config.items() if k != "patterns"}
         print("Конфигурация:")
-        for key, value in self.config.items():
-            if key != "patterns":
-                print(f"  {key}: {value}")
+        print(json.dumps(cfg_view, indent=2, default=str))
 
         self.setup_environment()
 
-        for pattern in self.config["patterns"]:
-            name = pattern[0]
-            try:
-                print(f"\n=== Запуск теста {name} ===")
-                result_file = self.run_fio_test(pattern)
-                results = self.parse_results(result_file, name)
-                self.plot_iops(name)
-
-                # Вывод результатов
-                print("\nРезультаты:")
-                print(f"  Read IOPS: {results['read_iops']:.0f}")
-                if results['read_lat_avg'] is not None:
-                    print(f"  Read Avg Latency: {results['read_lat_avg']:.2f} ms")
-                    print(f"  Read Max Latency: {results['read_lat_max']:.2f} ms")
-
-                if 'write_iops' in results:
-                    print(f"\n  Write IOPS: {results['write_iops']:.0f}")
-                    if results['write_lat_avg'] is not None:
-                        print(f"  Write Avg Latency: {results['write_lat_avg']:.2f} ms")
-                        print(f"  Write Max Latency: {results['write_lat_max']:.2f} ms")
-
-            except Exception as e:
-                print(f"Ошибка в тесте {name}: {str(e)}")
-                continue
+        if self.config["batch"]:
+            self._run_batched()
+        elif self.config["parallel"]:
+            self._run_parallel()
+        else:
+            for pattern in self.config["patterns"]:
+                name = pattern[0]
+                try:
+                    print(f"\n=== Запуск теста {name} ===")
+                    result_file = self.run_fio_test(pattern)
+                    self._process_results(result_file, name)
+                except Exception as e:
+                    print(f"Ошибка в тесте {name}: {str(e)}")
+                    continue
 
         print("\n=== Тестирование завершено ===")
         print(f"Все результаты сохранены в {self.results_dir}")
@@ -319,6 +656,12 @@ def parse_args():
     parser.add_argument('--base_results_dir', help='Results directory (default: ./results)')
     parser.add_argument('--latency_threshold', type=float,
                         help='Latency threshold in ms for marking on graphs (default: 1.0)')
+    parser.add_argument('--parallel', action='store_true', default=None,
+                        help='Run all patterns concurrently, each against its own '
+                             'file {filename}.{pattern} (default: off)')
+    parser.add_argument('--batch', action='store_true', default=None,
+                        help='Run all patterns in a single fio invocation '
+                             '(amortizes startup and file layout, default: off)')
     parser.add_argument('--config', help='Path to config file')
 
     return parser.parse_args()
@@ -347,7 +690,9 @@ if __name__ == "__main__":
         "filename": args.filename,
         "file_size": args.file_size,
         "base_results_dir": args.base_results_dir,
-        "latency_threshold": args.latency_threshold
+        "latency_threshold": args.latency_threshold,
+        "parallel": args.parallel,
+        "batch": args.batch
     }
 
     for key, value in optional_args.items():